@@ -150,9 +150,9 @@ def update_model_graph(models_id: int) -> flask.Response:
         return {"message": f"data is unreadable: {e}"}, status.HTTP_400_BAD_REQUEST
 
     if request.method == "PUT":
-        model.graph.remove((None, None, None))
-
-    model.add_graph(graph)
+        model.replace_graph(graph)
+    else:
+        model.add_graph(graph)
 
     current_app.building_motif.session.commit()
 
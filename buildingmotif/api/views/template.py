@@ -17,12 +17,19 @@ blueprint = Blueprint("templates", __name__)
 
 @blueprint.route("", methods=(["GET"]))
 def get_all_templates() -> flask.Response:
-    """Get all templates.
+    """Get all templates, or the templates of one library if the
+    `library_id` query parameter is given. Template dependencies are loaded
+    in the same batch as the templates.
 
     :return: all templates
     :rtype: flask.Response
     """
-    db_templates = current_app.building_motif.table_connection.get_all_db_templates()
+    table_connection = current_app.building_motif.table_connection
+    library_id = request.args.get("library_id")
+    if library_id is not None:
+        db_templates = table_connection.get_db_templates_by_library(int(library_id))
+    else:
+        db_templates = table_connection.get_all_db_templates()
 
     return jsonify(serialize(db_templates)), status.HTTP_200_OK
 
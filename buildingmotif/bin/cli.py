@@ -6,6 +6,8 @@ from os import getenv
 from pathlib import Path
 
 from buildingmotif import BuildingMOTIF
+from buildingmotif.building_motif.building_motif import BuildingMotifEngine
+from buildingmotif.database.term_store import TermDictionaryStore, copy_store
 from buildingmotif.dataclasses import Library
 from buildingmotif.ingresses.bacnet import BACnetNetwork
 
@@ -145,6 +147,34 @@ def serve(args):
     webapp.run(host=args.host, port=args.port, threaded=False)
 
 
+@subcommand(
+    arg(
+        "-d",
+        "--db",
+        help="Database URI of the BuildingMOTIF installation. "
+        'Defaults to $DB_URI and then contents of "config.py"',
+    ),
+)
+def migrate_store(args):
+    """
+    Copies every graph of the BuildingMOTIF instance at $DB_URI from the
+    rdflib-sqlalchemy tables into the term dictionary tables, after which the
+    instance can be opened with store_backend="term_dictionary". Graphs which
+    were already copied are left as they are, so this can be run again.
+    """
+    db_uri = get_db_uri(args)
+    bm = BuildingMOTIF(db_uri)
+    target = TermDictionaryStore(
+        BuildingMotifEngine(bm.engine, bm.Session),
+        identifier=bm.graph_connection.store.identifier,
+    )
+    target.create_all()
+    source = bm.graph_connection.store
+    log.info(f"Copying {len(source)} triples into the term dictionary tables")
+    copy_store(source, target)
+    bm.session.commit()
+
+
 def app():
     args = cli.parse_args()
     if args.subcommand is None:
@@ -12,7 +12,10 @@ from buildingmotif.building_motif.singleton import (
     Singleton,
     SingletonNotInstantiatedException,
 )
-from buildingmotif.database.graph_connection import GraphConnection
+from buildingmotif.database.graph_connection import (
+    DEFAULT_BULK_LOAD_THRESHOLD,
+    GraphConnection,
+)
 from buildingmotif.database.table_connection import TableConnection
 from buildingmotif.database.tables import Base as BuildingMOTIFBase
 from buildingmotif.database.utils import (
@@ -30,6 +33,8 @@ class BuildingMOTIF(metaclass=Singleton):
         db_uri: str,
         shacl_engine: Optional[str] = "pyshacl",
         log_level=logging.WARNING,
+        bulk_load_threshold: Optional[int] = DEFAULT_BULK_LOAD_THRESHOLD,
+        store_backend: str = "sqlalchemy",
     ) -> None:
         """Class constructor.
 
@@ -42,6 +47,13 @@ class BuildingMOTIF(metaclass=Singleton):
         :param log_level: logging level of detail
         :type log_level: int
         :default log_level: INFO
+        :param bulk_load_threshold: graphs with at least this many triples are
+            written to the database with the bulk-ingest path; None disables it,
+            defaults to DEFAULT_BULK_LOAD_THRESHOLD
+        :type bulk_load_threshold: Optional[int], optional
+        :param store_backend: table layout used to store graphs: "sqlalchemy"
+            or "term_dictionary" (integer-encoded terms), defaults to "sqlalchemy"
+        :type store_backend: str, optional
         """
         self.db_uri = db_uri
         self.shacl_engine = shacl_engine or "pyshacl"
@@ -62,7 +74,9 @@ class BuildingMOTIF(metaclass=Singleton):
 
         self.table_connection = TableConnection(self.engine, self)
         self.graph_connection = GraphConnection(
-            BuildingMotifEngine(self.engine, self.Session)
+            BuildingMotifEngine(self.engine, self.Session),
+            bulk_load_threshold=bulk_load_threshold,
+            store_backend=store_backend,
         )
 
         g = Graph()
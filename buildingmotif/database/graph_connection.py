@@ -1,15 +1,32 @@
+import io
 import logging
 from pathlib import Path
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
 
 from rdflib.graph import Graph, Store, URIRef, plugin
-from rdflib.namespace import NamespaceManager
+from rdflib.namespace import RDF, NamespaceManager
+from rdflib.term import Literal, Node
+from rdflib_sqlalchemy.termutils import (
+    statement_to_term_combination,
+    type_to_term_combination,
+)
+from sqlalchemy import event
+
+from buildingmotif.database.term_store import TermDictionaryStore
 
 if TYPE_CHECKING:
     from buildingmotif.building_motif.building_motif import BuildingMotifEngine
 
 PROJECT_DIR = Path(__file__).resolve().parent
 
+# graphs with at least this many triples are written with the bulk-ingest path
+DEFAULT_BULK_LOAD_THRESHOLD = 10000
+# number of rows sent to the database in a single executemany call
+BULK_LOAD_BATCH_SIZE = 10000
+
+# names accepted by GraphConnection's store_backend argument
+STORE_BACKENDS = ("sqlalchemy", "term_dictionary")
+
 
 class GraphConnection:
     """Manages graph connection."""
@@ -18,6 +35,8 @@ class GraphConnection:
         self,
         engine: "BuildingMotifEngine",
         db_identifier: Optional[str] = "buildingmotif_store",
+        bulk_load_threshold: Optional[int] = DEFAULT_BULK_LOAD_THRESHOLD,
+        store_backend: str = "sqlalchemy",
     ) -> None:
         """Constructor for the database and datastore.
 
@@ -25,12 +44,33 @@ class GraphConnection:
         :type engine: Engine
         :param db_identifier: defaults to "buildingmotif_store"
         :type db_identifier: Optional[str], optional
+        :param bulk_load_threshold: graphs with at least this many triples are
+            written using :py:meth:`bulk_add_graph`; None disables the bulk path,
+            defaults to DEFAULT_BULK_LOAD_THRESHOLD
+        :type bulk_load_threshold: Optional[int], optional
+        :param store_backend: how graphs are laid out in the database:
+            "sqlalchemy" uses the rdflib-sqlalchemy tables, "term_dictionary"
+            uses :py:class:`TermDictionaryStore`, defaults to "sqlalchemy"
+        :type store_backend: str, optional
+        :raises ValueError: if the store backend is unknown
         """
+        if store_backend not in STORE_BACKENDS:
+            raise ValueError(
+                f"Unknown store backend '{store_backend}', "
+                f"expected one of {STORE_BACKENDS}"
+            )
         self.logger = logging.getLogger(__name__)
+        self.bulk_load_threshold = bulk_load_threshold
+        # graphs handed out by get_graph(..., cached=True), keyed by identifier
+        self._cached_graphs: Dict[str, "CachedGraph"] = {}
 
-        self.store = plugin.get("SQLAlchemy", Store)(
-            identifier=db_identifier, engine=engine
-        )
+        self.store_backend = store_backend
+        if store_backend == "term_dictionary":
+            self.store = TermDictionaryStore(engine, identifier=db_identifier)
+        else:
+            self.store = plugin.get("SQLAlchemy", Store)(
+                identifier=db_identifier, engine=engine
+            )
 
         # avoids the warnings raised by the issue in https://github.com/RDFLib/rdflib/issues/1880
         # Eventually will require rdflib-sqlalchemy to support the 'override' keyword
@@ -42,6 +82,11 @@ class GraphConnection:
         self.logger.debug("Creating tables for graph storage")
         self.store.create_all()
 
+        # write cached graphs back to the store as part of every commit
+        event.listen(engine.Session, "before_commit", self._before_commit)
+        event.listen(engine.Session, "after_commit", self._after_commit)
+        event.listen(engine.Session, "after_rollback", self._after_rollback)
+
     def create_graph(self, identifier: str, graph: Graph) -> Graph:
         """Create a graph in the database.
 
@@ -56,10 +101,170 @@ class GraphConnection:
             f"Creating graph: '{identifier}' in database with: {len(graph)} triples"
         )
         g = Graph(self.store, identifier=identifier)
+        self.add_graph(identifier, graph)
+
+        return g
+
+    def add_graph(self, identifier: str, graph: Graph) -> None:
+        """Add the triples of a graph to the graph with the given identifier.
+        Uses :py:meth:`bulk_add_graph` if the graph has at least
+        `bulk_load_threshold` triples.
+
+        :param identifier: identifier of the graph to add to
+        :type identifier: str
+        :param graph: graph containing the triples to add
+        :type graph: Graph
+        """
+        self.invalidate_cached_graph(identifier)
+        self._add_graph(identifier, graph)
+
+    def _add_graph(self, identifier: str, graph: Graph) -> None:
+        if (
+            self.bulk_load_threshold is not None
+            and len(graph) >= self.bulk_load_threshold
+        ):
+            self._bulk_add_graph(identifier, graph)
+            return
+        g = Graph(self.store, identifier=identifier)
         new_triples = [(s, o, p, g) for (s, o, p) in graph]
         g.addN(new_triples)
 
-        return g
+    def bulk_add_graph(self, identifier: str, graph: Graph) -> None:
+        """Add the triples of a graph to the graph with the given identifier
+        using dialect-native batching: `executemany` with large batches on
+        SQLite and `COPY` on PostgreSQL. Triples which already exist in the
+        graph are ignored.
+
+        The rows are identical to those written by rdflib-sqlalchemy, so the
+        result is readable through :py:meth:`get_graph`. The term dictionary
+        store batches its writes itself, so its `addN` is used directly.
+
+        :param identifier: identifier of the graph to add to
+        :type identifier: str
+        :param graph: graph containing the triples to add
+        :type graph: Graph
+        """
+        self.invalidate_cached_graph(identifier)
+        self._bulk_add_graph(identifier, graph)
+
+    def _bulk_add_graph(self, identifier: str, graph: Graph) -> None:
+        self.logger.debug(
+            f"Bulk loading {len(graph)} triples into graph: '{identifier}'"
+        )
+        context = Graph(self.store, identifier=identifier)
+        if isinstance(self.store, TermDictionaryStore):
+            self.store.addN((s, p, o, context) for (s, p, o) in graph)
+            return
+        rows = self._partition_rows(graph, context)
+        with self.store.engine.begin() as session:
+            connection = session.connection()
+            for table_name, table_rows in rows.items():
+                if not table_rows:
+                    continue
+                table = self.store.tables[table_name]
+                if connection.dialect.name == "postgresql":
+                    self._copy_rows(connection, table, table_rows)
+                    continue
+                statement = self.store._add_ignore_on_conflict(table.insert())
+                for start in range(0, len(table_rows), BULK_LOAD_BATCH_SIZE):
+                    connection.execute(
+                        statement, table_rows[start : start + BULK_LOAD_BATCH_SIZE]
+                    )
+
+    def _partition_rows(
+        self, graph: Graph, context: Graph
+    ) -> Dict[str, List[Dict[str, Optional[object]]]]:
+        """Turn the triples of a graph into rows for each of the rdflib-sqlalchemy
+        statement tables. Mirrors the partitioning done by the store's `addN`.
+
+        :param graph: graph containing the triples
+        :type graph: Graph
+        :param context: the graph the triples will belong to
+        :type context: Graph
+        :return: rows keyed by table name
+        :rtype: Dict[str, List[Dict[str, Optional[object]]]]
+        """
+        rows: Dict[str, List[Dict[str, Optional[object]]]] = {
+            "type_statements": [],
+            "literal_statements": [],
+            "asserted_statements": [],
+        }
+        context_id = str(context.identifier)
+        for s, p, o in graph.triples((None, None, None)):
+            if p == RDF.type:
+                rows["type_statements"].append(
+                    {
+                        "member": str(s),
+                        "klass": str(o),
+                        "context": context_id,
+                        "termComb": int(type_to_term_combination(s, o, context)),
+                    }
+                )
+            elif isinstance(o, Literal):
+                rows["literal_statements"].append(
+                    {
+                        "subject": str(s),
+                        "predicate": str(p),
+                        "object": str(o),
+                        "context": context_id,
+                        "termComb": int(
+                            statement_to_term_combination(s, p, o, context)
+                        ),
+                        "objLanguage": o.language or None,
+                        "objDatatype": str(o.datatype) if o.datatype else None,
+                    }
+                )
+            else:
+                rows["asserted_statements"].append(
+                    {
+                        "subject": str(s),
+                        "predicate": str(p),
+                        "object": str(o),
+                        "context": context_id,
+                        "termComb": int(
+                            statement_to_term_combination(s, p, o, context)
+                        ),
+                    }
+                )
+        return rows
+
+    def _copy_rows(self, connection, table, rows: List[Dict]) -> None:
+        """Write rows into a table using PostgreSQL's `COPY`. Rows are copied
+        into a temporary staging table first so that rows which already exist
+        can be skipped with `ON CONFLICT DO NOTHING`.
+
+        :param connection: SQLAlchemy connection with a psycopg2 DBAPI connection
+        :param table: the rdflib-sqlalchemy table to write to
+        :type table: Table
+        :param rows: the rows to write
+        :type rows: List[Dict]
+        """
+        keys = list(rows[0].keys())
+        columns = ", ".join(table.c[key].name for key in keys)
+        staging = f"{table.name}_staging"
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(_copy_escape(row[key]) for key in keys))
+            buffer.write("\n")
+        buffer.seek(0)
+
+        cursor = connection.connection.cursor()
+        try:
+            # the staging table lives for the session of the pooled connection;
+            # reuse it if an earlier load left it behind, and empty it first
+            cursor.execute(
+                f'CREATE TEMP TABLE IF NOT EXISTS "{staging}" AS '
+                f'SELECT {columns} FROM "{table.name}" WITH NO DATA'
+            )
+            cursor.execute(f'TRUNCATE "{staging}"')
+            cursor.copy_expert(f'COPY "{staging}" ({columns}) FROM STDIN', buffer)
+            cursor.execute(
+                f'INSERT INTO "{table.name}" ({columns}) '
+                f'SELECT {columns} FROM "{staging}" ON CONFLICT DO NOTHING'
+            )
+            cursor.execute(f'TRUNCATE "{staging}"')
+        finally:
+            cursor.close()
 
     def get_all_graph_identifiers(self) -> List[str]:
         """Get all graph identifiers.
@@ -70,14 +275,30 @@ class GraphConnection:
         graph_identifiers = [str(c) for c in self.store.contexts()]
         return graph_identifiers
 
-    def get_graph(self, identifier: str) -> Graph:
+    def get_graph(self, identifier: str, cached: bool = False) -> Graph:
         """Get graph by identifier. Graph has triples, no context.
 
+        If `cached` is True, the graph is loaded once into an in-memory
+        :py:class:`CachedGraph`. Reads are served from memory, and the triples
+        added and removed are written back to the database when the session is
+        committed (or when :py:meth:`flush_cached_graphs` is called). The copy
+        is valid for the current transaction: after a commit or rollback it is
+        reloaded from the database the next time it is used.
+
         :param identifier: graph identifier
         :type identifier: str
+        :param cached: if True, return a write-back in-memory copy of the
+            graph, defaults to False
+        :type cached: bool, optional
         :return: graph without context
         :rtype: Graph
         """
+        if cached:
+            if identifier not in self._cached_graphs:
+                self.logger.debug(f"Caching graph: '{identifier}' in memory")
+                self._cached_graphs[identifier] = CachedGraph(identifier, self)
+            return self._cached_graphs[identifier]
+
         result = Graph(self.store, identifier=identifier)
         # we used to bind prefixes here but this is unnecessary because
         # the graph has prefixes bound when it is saved
@@ -91,5 +312,189 @@ class GraphConnection:
         :type identifier: str
         """
         self.logger.debug(f"Deleting graph: '{identifier}'")
+        self.invalidate_cached_graph(identifier, discard=True)
         g = Graph(self.store, identifier=identifier)
         self.store.remove((None, None, None), g)
+
+    def invalidate_cached_graph(self, identifier: str, discard: bool = False) -> None:
+        """Stop serving a graph from its cached copy, e.g. because it was
+        written to without going through the copy. Pending changes of the
+        copy are written back first unless `discard` is True. The copy is
+        reloaded from the database the next time it is used.
+
+        :param identifier: graph identifier
+        :type identifier: str
+        :param discard: if True, drop the pending changes of the copy,
+            defaults to False
+        :type discard: bool, optional
+        """
+        cached = self._cached_graphs.pop(identifier, None)
+        if cached is None:
+            return
+        if not discard:
+            self._flush_cached_graph(cached)
+        cached.detach()
+
+    def flush_cached_graphs(self) -> None:
+        """Write the triples added to and removed from all cached graphs
+        back to the database.
+        """
+        for cached in self._cached_graphs.values():
+            self._flush_cached_graph(cached)
+
+    def _flush_cached_graph(self, cached: "CachedGraph") -> None:
+        if not cached.dirty:
+            return
+        identifier = str(cached.identifier)
+        self.logger.debug(
+            f"Flushing cached graph: '{identifier}' "
+            f"(+{len(cached.added)} / -{len(cached.removed)} triples)"
+        )
+        g = Graph(self.store, identifier=identifier)
+        for triple in cached.removed:
+            self.store.remove(triple, g)
+        if cached.added:
+            delta = Graph()
+            for triple in cached.added:
+                delta.add(triple)
+            self._add_graph(identifier, delta)
+        cached.mark_clean()
+
+    def _register_cached_graph(self, cached: "CachedGraph") -> None:
+        identifier = str(cached.identifier)
+        existing = self._cached_graphs.get(identifier)
+        if existing is not None and existing is not cached:
+            self.invalidate_cached_graph(identifier)
+        self._cached_graphs[identifier] = cached
+
+    def _detach_cached_graphs(self) -> None:
+        for cached in self._cached_graphs.values():
+            cached.detach()
+        self._cached_graphs.clear()
+
+    def _before_commit(self, session) -> None:
+        self.flush_cached_graphs()
+
+    def _after_commit(self, session) -> None:
+        # other sessions may write to the graphs once this transaction ends
+        self._detach_cached_graphs()
+
+    def _after_rollback(self, session) -> None:
+        # the cached copies may contain changes that were never written
+        self._detach_cached_graphs()
+
+
+class CachedGraph(Graph):
+    """An in-memory copy of a graph stored in the database which records
+    the triples added and removed since it was loaded. See
+    :py:meth:`GraphConnection.get_graph`.
+
+    The copy belongs to the transaction it was loaded in. Once that
+    transaction ends it is detached, and the next read or write reloads it
+    from the database and registers it with the connection again, so writes
+    are never dropped.
+    """
+
+    def __init__(self, identifier: str, connection: GraphConnection) -> None:
+        """Load the contents of the stored graph into memory.
+
+        :param identifier: identifier of the stored graph
+        :type identifier: str
+        :param connection: the connection the graph is stored in
+        :type connection: GraphConnection
+        """
+        super().__init__(identifier=identifier)
+        self._connection = connection
+        self.added: Set[Tuple[Node, Node, Node]] = set()
+        self.removed: Set[Tuple[Node, Node, Node]] = set()
+        self._load()
+
+    def _load(self) -> None:
+        super().remove((None, None, None))
+        source = Graph(self._connection.store, identifier=self.identifier)
+        for triple in source.triples((None, None, None)):
+            super().add(triple)
+        for prefix, namespace in source.namespaces():
+            self.bind(prefix, namespace)
+        self.added.clear()
+        self.removed.clear()
+        self._attached = True
+
+    def detach(self) -> None:
+        """Mark the copy as out of date. Called by the connection when the
+        transaction ends or the graph is written to directly.
+        """
+        self._attached = False
+
+    def _ensure_attached(self) -> None:
+        if self._attached:
+            return
+        self._connection.logger.debug(
+            f"Reloading cached graph: '{self.identifier}' from the database"
+        )
+        self._load()
+        self._connection._register_cached_graph(self)
+
+    @property
+    def dirty(self) -> bool:
+        """True if the graph has changes which are not yet written back."""
+        return bool(self.added or self.removed)
+
+    def mark_clean(self) -> None:
+        """Forget the recorded changes after they have been written back."""
+        self.added.clear()
+        self.removed.clear()
+
+    def triples(self, triple):
+        self._ensure_attached()
+        return super().triples(triple)
+
+    def triples_choices(self, triple, context=None):
+        self._ensure_attached()
+        return super().triples_choices(triple, context)
+
+    def __len__(self):
+        self._ensure_attached()
+        return super().__len__()
+
+    def add(self, triple):
+        self._ensure_attached()
+        if triple not in self:
+            if triple in self.removed:
+                self.removed.discard(triple)
+            else:
+                self.added.add(triple)
+        return super().add(triple)
+
+    def addN(self, quads):
+        for s, p, o, _ in quads:
+            self.add((s, p, o))
+        return self
+
+    def remove(self, triple):
+        self._ensure_attached()
+        for match in list(self.triples(triple)):
+            if match in self.added:
+                self.added.discard(match)
+            else:
+                self.removed.add(match)
+        return super().remove(triple)
+
+
+def _copy_escape(value: Optional[object]) -> str:
+    """Escape a value for PostgreSQL's `COPY ... FROM STDIN` text format.
+
+    :param value: the value to escape; None is written as NULL
+    :type value: Optional[object]
+    :return: the escaped value
+    :rtype: str
+    """
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
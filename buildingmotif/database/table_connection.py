@@ -3,8 +3,10 @@ import uuid
 from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 
+from sqlalchemy import select, update
 from sqlalchemy.engine import Engine
 from sqlalchemy.exc import NoResultFound
+from sqlalchemy.orm import joinedload, selectinload
 
 from buildingmotif.database.errors import (
     LibraryNotFound,
@@ -15,6 +17,7 @@ from buildingmotif.database.errors import (
 from buildingmotif.database.tables import (
     DBLibrary,
     DBModel,
+    DBModelChange,
     DBShapeCollection,
     DBTemplate,
     DBTemplateDependency,
@@ -34,6 +37,10 @@ class TableConnection:
         """
         self.logger = logging.getLogger(__name__)
         self.bm = bm
+        # incremented whenever templates or their dependencies are added or
+        # deleted; dataclasses holding pre-loaded dependencies compare against
+        # it to know when to read them again
+        self.template_dependency_revision = 0
 
     # model functions
 
@@ -136,14 +143,89 @@ class TableConnection:
         self.logger.debug(f"Deleting model: '{db_model.name}'")
         self.bm.session.delete(db_model)
 
+    def add_db_model_changes(
+        self, id: int, added: List[List[list]], removed: List[List[list]]
+    ) -> int:
+        """Append triples added to and removed from a model's graph to the
+        model's changelog as a new revision.
+
+        :param id: id of DBModel
+        :type id: int
+        :param added: added triples, encoded as in DBModelChange.triple
+        :type added: List[List[list]]
+        :param removed: removed triples, encoded as in DBModelChange.triple
+        :type removed: List[List[list]]
+        :return: the revision of the model after the changes
+        :rtype: int
+        """
+        db_model = self.get_db_model(id)
+        if not added and not removed:
+            return db_model.revision
+        # increment in the database rather than in Python so that concurrent
+        # writers cannot both claim the same revision; the UPDATE holds a lock
+        # on the row until the transaction ends
+        self.bm.session.execute(
+            update(DBModel)
+            .where(DBModel.id == id)
+            .values(revision=DBModel.revision + 1)
+            .execution_options(synchronize_session=False)
+        )
+        revision = self.bm.session.execute(
+            select(DBModel.revision).where(DBModel.id == id)
+        ).scalar_one()
+        self.bm.session.expire(db_model, ["revision"])
+        self.logger.debug(
+            f"Recording revision {revision} of model: '{db_model.name}' "
+            f"(+{len(added)} / -{len(removed)} triples)"
+        )
+        self.bm.session.bulk_insert_mappings(
+            DBModelChange,
+            [
+                {
+                    "model_id": id,
+                    "revision": revision,
+                    "added": is_added,
+                    "triple": triple,
+                }
+                for is_added, triples in ((True, added), (False, removed))
+                for triple in triples
+            ],
+        )
+        return revision
+
+    def get_db_model_changes(self, id: int, revision: int) -> List[DBModelChange]:
+        """Get the changelog entries of a model made after the given revision,
+        in the order they were made.
+
+        :param id: id of DBModel
+        :type id: int
+        :param revision: revision to get the changes since
+        :type revision: int
+        :return: changelog entries
+        :rtype: List[DBModelChange]
+        """
+        return (
+            self.bm.session.query(DBModelChange)
+            .filter(DBModelChange.model_id == id, DBModelChange.revision > revision)
+            .order_by(DBModelChange.revision, DBModelChange.id)
+            .all()
+        )
+
     # shape collection functions
-    def create_db_shape_collection(self) -> DBShapeCollection:
+    def create_db_shape_collection(
+        self, content_addressed: bool = False
+    ) -> DBShapeCollection:
         """Create a database shape collection.
 
+        :param content_addressed: whether the shape collection may be shared
+            by lookups on its content hash, defaults to False
+        :type content_addressed: bool, optional
         :return: DBShapeCollection
         :rtype: DBShapeCollection
         """
-        db_shape_collection = DBShapeCollection(graph_id=str(uuid.uuid4()))
+        db_shape_collection = DBShapeCollection(
+            graph_id=str(uuid.uuid4()), content_addressed=content_addressed
+        )
 
         self.bm.session.add(db_shape_collection)
         self.bm.session.flush()
@@ -175,6 +257,50 @@ class TableConnection:
         except NoResultFound:
             raise ShapeCollectionNotFound(idnum=id)
 
+    def get_db_shape_collection_by_content_hash(
+        self, content_hash: str
+    ) -> DBShapeCollection:
+        """Get a content-addressed database shape collection (one created by
+        :py:meth:`ShapeCollection.from_graph`) by the digest of its graph
+        contents. Shape collections owned by libraries or models are never
+        returned.
+
+        :param content_hash: digest of the graph contents
+        :type content_hash: str
+        :return: DBShapeCollection
+        :rtype: DBShapeCollection
+        """
+        db_shape_collection = (
+            self.bm.session.query(DBShapeCollection)
+            .filter(
+                DBShapeCollection.content_addressed.is_(True),
+                DBShapeCollection.content_hash == content_hash,
+            )
+            .order_by(DBShapeCollection.id)
+            .first()
+        )
+        if db_shape_collection is None:
+            raise ShapeCollectionNotFound(name=content_hash)
+        return db_shape_collection
+
+    def update_db_shape_collection_content_hash(
+        self, id: int, content_hash: Optional[str]
+    ) -> None:
+        """Update the digest of a database shape collection's graph contents.
+        This is called on every write to a shape collection's graph, so the
+        row is only touched if the digest actually changes.
+
+        :param id: id of DBShapeCollection
+        :type id: int
+        :param content_hash: new digest, or None if it is unknown
+        :type content_hash: Optional[str]
+        """
+        db_shape_collection = self.bm.session.get(DBShapeCollection, id)
+        if db_shape_collection is None:
+            raise ShapeCollectionNotFound(idnum=id)
+        if db_shape_collection.content_hash != content_hash:
+            db_shape_collection.content_hash = content_hash
+
     def delete_db_shape_collection(self, id: int) -> None:
         """Delete database shape collection.
 
@@ -269,6 +395,7 @@ class TableConnection:
 
         self.logger.debug(f"Deleting database library: '{db_library.name}'")
         self.bm.session.delete(db_library)
+        self.template_dependency_revision += 1
 
     # template functions
 
@@ -293,6 +420,7 @@ class TableConnection:
 
         self.bm.session.add(template)
         self.bm.session.flush()
+        self.template_dependency_revision += 1
 
         return template
 
@@ -302,9 +430,33 @@ class TableConnection:
         :return: all DBTemplate
         :rtype: List[DBTemplate]
         """
-        db_templates = self.bm.session.query(DBTemplate).all()
+        db_templates = (
+            self.bm.session.query(DBTemplate)
+            .options(selectinload(DBTemplate.dependencies))
+            .all()
+        )
         return db_templates
 
+    def get_db_templates_by_library(self, library_id: int) -> List[DBTemplate]:
+        """Get all database templates of a library. The dependencies of the
+        templates are loaded in the same round trip, so the whole library is
+        read with a constant number of queries.
+
+        :param library_id: id of DBLibrary
+        :type library_id: int
+        :return: the library's DBTemplates, in the order they were created
+        :rtype: List[DBTemplate]
+        """
+        return (
+            self.bm.session.query(DBTemplate)
+            .filter(DBTemplate.library_id == library_id)
+            .options(
+                selectinload(DBTemplate.dependencies), joinedload(DBTemplate.library)
+            )
+            .order_by(DBTemplate.id)
+            .all()
+        )
+
     def get_db_template(self, id: int) -> DBTemplate:
         """Get database template by id.
 
@@ -460,6 +612,7 @@ class TableConnection:
 
         self.bm.session.add(relationship)
         self.bm.session.flush()
+        self.template_dependency_revision += 1
         self.logger.debug(f"Created Dependency with id: '{relationship.id}'")
 
     def check_all_template_dependencies(self):
@@ -556,6 +709,7 @@ class TableConnection:
             .one()
         )
         self.bm.session.delete(relationship)
+        self.template_dependency_revision += 1
 
     def update_db_template_library(self, id: int, library_id: int) -> None:
         """Update database template library.
@@ -581,3 +735,4 @@ class TableConnection:
         self.logger.debug(f"Deleting template: '{db_template.name}'")
 
         self.bm.session.delete(db_template)
+        self.template_dependency_revision += 1
@@ -1,8 +1,10 @@
 from typing import Dict, List, Optional
 
 from sqlalchemy import (
+    Boolean,
     Column,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -37,6 +39,8 @@ class DBModel(Base):
     name: Mapped[str] = Column(String())
     description: Mapped[str] = Column(Text(), default="", nullable=False)
     graph_id: Mapped[str] = Column(String())
+    # incremented every time a set of changes is appended to the changelog
+    revision: Mapped[int] = Column(Integer, default=0, nullable=False)
     manifest_id: Mapped[int] = Column(
         Integer, ForeignKey("shape_collection.id", ondelete="CASCADE"), nullable=False
     )
@@ -46,6 +50,36 @@ class DBModel(Base):
         cascade="all",
         passive_deletes=True,
     )
+    changes: Mapped[List["DBModelChange"]] = relationship(
+        "DBModelChange",
+        back_populates="model",
+        cascade="all,delete-orphan",
+        passive_deletes=True,
+    )
+
+
+class DBModelChange(Base):
+    """A triple added to or removed from the graph of a Model at a given
+    revision of that model.
+    """
+
+    __tablename__ = "model_change"
+    id: Mapped[int] = Column(Integer, primary_key=True)
+    model_id: Mapped[int] = Column(
+        Integer, ForeignKey("models.id", ondelete="CASCADE"), nullable=False
+    )
+    model: Mapped[DBModel] = relationship(DBModel, back_populates="changes")
+    revision: Mapped[int] = Column(Integer, nullable=False)
+    # True if the triple was added, False if it was removed
+    added: Mapped[bool] = Column(Boolean, nullable=False)
+    # the triple as a list of [kind, value, datatype, language] terms
+    triple: Mapped[List[List[Optional[str]]]] = Column(  # type: ignore
+        JSONType, nullable=False
+    )
+
+    __table_args__ = (
+        Index("ix_model_change_model_revision", "model_id", "revision"),
+    )
 
 
 class DBShapeCollection(Base):
@@ -56,6 +90,12 @@ class DBShapeCollection(Base):
     __tablename__ = "shape_collection"
     id: Mapped[int] = Column(Integer, primary_key=True)
     graph_id: Mapped[str] = Column(String())
+    # digest of the graph contents (see utils.graph_digest); None if the graph
+    # has been modified through ShapeCollection since the digest was computed
+    content_hash: Mapped[Optional[str]] = Column(String(), index=True, nullable=True)
+    # True if the shape collection was created by ShapeCollection.from_graph and
+    # may be shared by everyone asking for a graph with the same contents
+    content_addressed: Mapped[bool] = Column(Boolean, default=False, nullable=False)
 
 
 class DBLibrary(Base):
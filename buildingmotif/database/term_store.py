@@ -0,0 +1,452 @@
+import hashlib
+import logging
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from rdflib.graph import Graph
+from rdflib.store import Store
+from rdflib.term import BNode, Literal, Node, URIRef
+from sqlalchemy import (
+    Column,
+    Index,
+    Integer,
+    MetaData,
+    PrimaryKeyConstraint,
+    String,
+    Table,
+    Text,
+    and_,
+    delete,
+    event,
+    func,
+    select,
+    true,
+)
+from sqlalchemy.dialects import postgresql
+
+if TYPE_CHECKING:
+    from buildingmotif.building_motif.building_motif import BuildingMotifEngine
+
+# number of rows or terms sent to the database in a single statement
+BATCH_SIZE = 10000
+
+TERMS_TABLE = "term_dictionary"
+QUADS_TABLE = "term_quads"
+NAMESPACES_TABLE = "term_namespace_binds"
+
+# the kinds of term stored in the dictionary
+URIREF_KIND = "U"
+BNODE_KIND = "B"
+LITERAL_KIND = "L"
+
+
+def create_term_store_tables(metadata: MetaData) -> Dict[str, Table]:
+    """Define the tables of the term dictionary store on the given metadata.
+
+    Every distinct term is stored once in the terms table. Quads refer to
+    terms by their integer id and are indexed in SPO, POS and OSP order within
+    each context.
+
+    :param metadata: metadata to define the tables on
+    :type metadata: MetaData
+    :return: the tables keyed by their role: "terms", "quads" and "namespaces"
+    :rtype: Dict[str, Table]
+    """
+    terms = Table(
+        TERMS_TABLE,
+        metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        # sha1 of the kind, value, datatype and language; long values cannot
+        # be indexed directly on every backend
+        Column("digest", String(40), nullable=False, unique=True),
+        Column("kind", String(1), nullable=False),
+        Column("value", Text, nullable=False),
+        Column("datatype", Text, nullable=True),
+        Column("language", String(), nullable=True),
+    )
+    quads = Table(
+        QUADS_TABLE,
+        metadata,
+        Column("context", Integer, nullable=False),
+        Column("subject", Integer, nullable=False),
+        Column("predicate", Integer, nullable=False),
+        Column("object", Integer, nullable=False),
+        PrimaryKeyConstraint(
+            "context", "subject", "predicate", "object", name=f"{QUADS_TABLE}_spo"
+        ),
+        Index(f"{QUADS_TABLE}_pos", "context", "predicate", "object", "subject"),
+        Index(f"{QUADS_TABLE}_osp", "context", "object", "subject", "predicate"),
+    )
+    namespaces = Table(
+        NAMESPACES_TABLE,
+        metadata,
+        Column("prefix", String(), primary_key=True),
+        Column("uri", Text, nullable=False),
+    )
+    return {"terms": terms, "quads": quads, "namespaces": namespaces}
+
+
+def term_digest(
+    kind: str, value: str, datatype: Optional[str], language: Optional[str]
+) -> str:
+    """Compute the key identifying a term in the terms table.
+
+    :param kind: one of URIREF_KIND, BNODE_KIND or LITERAL_KIND
+    :type kind: str
+    :param value: lexical value of the term
+    :type value: str
+    :param datatype: datatype of a literal
+    :type datatype: Optional[str]
+    :param language: language tag of a literal
+    :type language: Optional[str]
+    :return: hex digest
+    :rtype: str
+    """
+    key = "\x00".join([kind, value, datatype or "", language or ""])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+class TermDictionaryStore(Store):
+    """A context-aware rdflib store which keeps each distinct term once in a
+    terms table and stores quads as tuples of integer term ids.
+
+    Pattern lookups become integer comparisons against composite indexes, and
+    long URIs are not repeated in every row. Use it through
+    :py:class:`~buildingmotif.database.graph_connection.GraphConnection` with
+    `store_backend="term_dictionary"`.
+    """
+
+    context_aware = True
+    formula_aware = False
+    transaction_aware = False
+    graph_aware = False
+
+    def __init__(self, engine: "BuildingMotifEngine", identifier=None) -> None:
+        """Constructor for the store.
+
+        :param engine: database engine; its `begin()` yields the session used
+            for all statements
+        :type engine: BuildingMotifEngine
+        :param identifier: identifier of the store, defaults to None
+        :type identifier: Optional[str], optional
+        """
+        super().__init__(identifier=identifier)
+        self.logger = logging.getLogger(__name__)
+        self.engine = engine
+        self.metadata = MetaData()
+        self.tables = create_term_store_tables(self.metadata)
+        # term <-> id caches; terms are never deleted, so entries only become
+        # stale when the transaction which created them is rolled back
+        self._ids: Dict[Node, int] = {}
+        self._terms: Dict[int, Node] = {}
+        session_factory = getattr(engine, "Session", None)
+        if session_factory is not None:
+            event.listen(session_factory, "after_rollback", self._after_rollback)
+
+    def create_all(self) -> None:
+        """Create the tables of the store if they do not exist."""
+        self.metadata.create_all(self.engine.engine)
+
+    def _after_rollback(self, session) -> None:
+        self._ids.clear()
+        self._terms.clear()
+
+    # term encoding
+
+    @staticmethod
+    def _term_row(term: Node) -> Dict[str, Optional[str]]:
+        if isinstance(term, Literal):
+            kind = LITERAL_KIND
+            datatype = str(term.datatype) if term.datatype else None
+            language = term.language or None
+        elif isinstance(term, BNode):
+            kind, datatype, language = BNODE_KIND, None, None
+        else:
+            kind, datatype, language = URIREF_KIND, None, None
+        value = str(term)
+        return {
+            "digest": term_digest(kind, value, datatype, language),
+            "kind": kind,
+            "value": value,
+            "datatype": datatype,
+            "language": language,
+        }
+
+    @staticmethod
+    def _row_to_term(row) -> Node:
+        if row.kind == LITERAL_KIND:
+            return Literal(
+                row.value,
+                lang=row.language or None,
+                datatype=URIRef(row.datatype) if row.datatype else None,
+            )
+        if row.kind == BNODE_KIND:
+            return BNode(row.value)
+        return URIRef(row.value)
+
+    def _encode(self, terms: Iterable[Node], create: bool) -> Dict[Node, int]:
+        """Look up the ids of the given terms, reading the database only for
+        terms which are not cached.
+
+        :param terms: terms to encode
+        :type terms: Iterable[Node]
+        :param create: if True, add terms missing from the terms table
+        :type create: bool
+        :return: ids of the terms which exist
+        :rtype: Dict[Node, int]
+        """
+        result: Dict[Node, int] = {}
+        missing: Dict[str, Node] = {}
+        rows: Dict[str, Dict[str, Optional[str]]] = {}
+        for term in terms:
+            if term in self._ids:
+                result[term] = self._ids[term]
+                continue
+            row = self._term_row(term)
+            missing[row["digest"]] = term  # type: ignore
+            rows[row["digest"]] = row  # type: ignore
+        if not missing:
+            return result
+
+        table = self.tables["terms"]
+        with self.engine.begin() as session:
+            found = self._select_ids(session, list(missing))
+            if create:
+                new_rows = [rows[d] for d in missing if d not in found]
+                if new_rows:
+                    statement = self._insert_ignore(session, table)
+                    for start in range(0, len(new_rows), BATCH_SIZE):
+                        session.execute(
+                            statement, new_rows[start : start + BATCH_SIZE]
+                        )
+                    found.update(
+                        self._select_ids(
+                            session, [row["digest"] for row in new_rows]  # type: ignore
+                        )
+                    )
+        for digest, term_id in found.items():
+            term = missing[digest]
+            self._ids[term] = term_id
+            self._terms[term_id] = term
+            result[term] = term_id
+        return result
+
+    def _select_ids(self, session, digests: List[str]) -> Dict[str, int]:
+        table = self.tables["terms"]
+        found: Dict[str, int] = {}
+        # stay well below the bound-parameter limit of SQLite
+        for start in range(0, len(digests), 500):
+            chunk = digests[start : start + 500]
+            for digest, term_id in session.execute(
+                select(table.c.digest, table.c.id).where(table.c.digest.in_(chunk))
+            ):
+                found[digest] = term_id
+        return found
+
+    def _decode(self, session, ids: Iterable[int]) -> None:
+        """Make sure the terms for the given ids are cached.
+
+        :param session: session to read the terms table with
+        :param ids: ids of the terms
+        :type ids: Iterable[int]
+        """
+        table = self.tables["terms"]
+        missing = [i for i in set(ids) if i not in self._terms]
+        for start in range(0, len(missing), 500):
+            chunk = missing[start : start + 500]
+            for row in session.execute(select(table).where(table.c.id.in_(chunk))):
+                term = self._row_to_term(row)
+                self._terms[row.id] = term
+                self._ids[term] = row.id
+
+    @staticmethod
+    def _insert_ignore(session, table: Table):
+        """Build an insert statement which skips rows that already exist."""
+        dialect = session.get_bind().dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert(table).on_conflict_do_nothing()
+        if dialect == "sqlite":
+            return table.insert().prefix_with("OR IGNORE")
+        return table.insert()
+
+    @staticmethod
+    def _context_identifier(context) -> Optional[Node]:
+        if context is None:
+            return None
+        if isinstance(context, Graph):
+            return context.identifier
+        return context
+
+    def _pattern_clauses(self, triple, context) -> Optional[list]:
+        """Turn a triple pattern and context into where clauses on the quads
+        table. Returns None if a bound term does not exist, in which case
+        nothing can match.
+        """
+        quads = self.tables["quads"]
+        s, p, o = triple if triple is not None else (None, None, None)
+        bound = {
+            column: term
+            for column, term in (
+                ("subject", s),
+                ("predicate", p),
+                ("object", o),
+                ("context", self._context_identifier(context)),
+            )
+            if term is not None
+        }
+        ids = self._encode(bound.values(), create=False)
+        if len(ids) < len(set(bound.values())):
+            return None
+        return [quads.c[column] == ids[term] for column, term in bound.items()]
+
+    # rdflib Store interface
+
+    def add(self, triple, context, quoted: bool = False) -> None:
+        self.addN([(*triple, context)])
+
+    def addN(self, quads: Iterable) -> None:
+        quads = [(s, p, o, self._context_identifier(c)) for (s, p, o, c) in quads]
+        if not quads:
+            return
+        terms: Set[Node] = set()
+        for quad in quads:
+            terms.update(quad)
+        ids = self._encode(terms, create=True)
+        rows = [
+            {
+                "context": ids[c],
+                "subject": ids[s],
+                "predicate": ids[p],
+                "object": ids[o],
+            }
+            for (s, p, o, c) in quads
+        ]
+        table = self.tables["quads"]
+        with self.engine.begin() as session:
+            statement = self._insert_ignore(session, table)
+            for start in range(0, len(rows), BATCH_SIZE):
+                session.execute(statement, rows[start : start + BATCH_SIZE])
+
+    def remove(self, triple, context=None) -> None:
+        clauses = self._pattern_clauses(triple, context)
+        if clauses is None:
+            return
+        table = self.tables["quads"]
+        with self.engine.begin() as session:
+            session.execute(delete(table).where(and_(true(), *clauses)))
+
+    def triples(
+        self, triple_pattern, context=None
+    ) -> Iterator[Tuple[Tuple[Node, Node, Node], Iterator[Optional[Graph]]]]:
+        clauses = self._pattern_clauses(triple_pattern, context)
+        if clauses is None:
+            return
+        quads = self.tables["quads"]
+        with self.engine.connect() as session:
+            rows = session.execute(
+                select(
+                    quads.c.subject, quads.c.predicate, quads.c.object, quads.c.context
+                ).where(and_(true(), *clauses))
+            ).all()
+            self._decode(session, {i for row in rows for i in row})
+        contexts: Dict[int, Graph] = {}
+        for s, p, o, c in rows:
+            if isinstance(context, Graph):
+                graph = context
+            else:
+                if c not in contexts:
+                    contexts[c] = Graph(self, identifier=self._terms[c])
+                graph = contexts[c]
+            yield (self._terms[s], self._terms[p], self._terms[o]), iter([graph])
+
+    def __len__(self, context=None) -> int:
+        clauses = self._pattern_clauses(None, context)
+        if clauses is None:
+            return 0
+        quads = self.tables["quads"]
+        with self.engine.connect() as session:
+            return session.execute(
+                select(func.count()).select_from(quads).where(and_(true(), *clauses))
+            ).scalar_one()
+
+    def contexts(self, triple=None) -> Generator[Node, None, None]:
+        clauses = self._pattern_clauses(triple, None)
+        if clauses is None:
+            return
+        quads = self.tables["quads"]
+        with self.engine.connect() as session:
+            ids = [
+                row[0]
+                for row in session.execute(
+                    select(quads.c.context).where(and_(true(), *clauses)).distinct()
+                )
+            ]
+            self._decode(session, ids)
+        for context_id in ids:
+            yield self._terms[context_id]
+
+    def bind(self, prefix: str, namespace: URIRef, override: bool = True) -> None:
+        table = self.tables["namespaces"]
+        with self.engine.begin() as session:
+            existing = session.execute(
+                select(table.c.prefix).where(
+                    (table.c.prefix == prefix) | (table.c.uri == str(namespace))
+                )
+            ).all()
+            if existing and not override:
+                return
+            session.execute(
+                delete(table).where(
+                    (table.c.prefix == prefix) | (table.c.uri == str(namespace))
+                )
+            )
+            session.execute(table.insert(), {"prefix": prefix, "uri": str(namespace)})
+
+    def namespace(self, prefix: str) -> Optional[URIRef]:
+        table = self.tables["namespaces"]
+        with self.engine.connect() as session:
+            uri = session.execute(
+                select(table.c.uri).where(table.c.prefix == prefix)
+            ).scalar()
+        return URIRef(uri) if uri is not None else None
+
+    def prefix(self, namespace: URIRef) -> Optional[str]:
+        table = self.tables["namespaces"]
+        with self.engine.connect() as session:
+            return session.execute(
+                select(table.c.prefix).where(table.c.uri == str(namespace))
+            ).scalar()
+
+    def namespaces(self) -> Iterator[Tuple[str, URIRef]]:
+        table = self.tables["namespaces"]
+        with self.engine.connect() as session:
+            rows = session.execute(select(table.c.prefix, table.c.uri)).all()
+        for prefix, uri in rows:
+            yield prefix, URIRef(uri)
+
+
+def copy_store(source: Store, target: Store) -> None:
+    """Copy every graph and namespace binding of one store into another, e.g.
+    to move an existing database from the rdflib-sqlalchemy tables into a
+    :py:class:`TermDictionaryStore`.
+
+    :param source: store to read from
+    :type source: Store
+    :param target: store to write to
+    :type target: Store
+    """
+    for prefix, namespace in source.namespaces():
+        target.bind(prefix, namespace)
+    for context in source.contexts():
+        identifier = context.identifier if isinstance(context, Graph) else context
+        graph = Graph(source, identifier=identifier)
+        target.addN((s, p, o, identifier) for (s, p, o) in graph)
@@ -41,7 +41,7 @@ class CompiledModel:
         self.shape_collections = shape_collections
         ontology_graph = rdflib.Graph()
         for shape_collection in shape_collections:
-            ontology_graph += shape_collection.graph
+            ontology_graph += shape_collection.cached_graph
 
         ontology_graph = skolemize_shapes(ontology_graph)
 
@@ -59,7 +59,7 @@ class CompiledModel:
     def graph(self) -> rdflib.Graph:
         g = copy_graph(self._compiled_graph)
         for shape_collection in self.shape_collections:
-            g += shape_collection.graph
+            g += shape_collection.cached_graph
         return g
 
     def validate_model_against_shapes(
@@ -184,7 +184,7 @@ class CompiledModel:
         :rtype: Optional[ShapeCollection]
         """
         for sc in self.shape_collections:
-            if (shape, A, SH.NodeShape) in sc.graph:
+            if (shape, A, SH.NodeShape) in sc.cached_graph:
                 return sc
         return None
 
@@ -14,7 +14,7 @@ from rdflib.util import guess_format
 
 from buildingmotif import get_building_motif
 from buildingmotif.database.errors import LibraryNotFound
-from buildingmotif.database.tables import DBLibrary, DBTemplate
+from buildingmotif.database.tables import DBLibrary
 from buildingmotif.dataclasses.shape_collection import ShapeCollection
 from buildingmotif.dataclasses.template import Template
 from buildingmotif.schemas import validate_libraries_yaml
@@ -70,7 +70,6 @@ class Library:
             bm.session.delete(template)
 
     # TODO: load library from URI? Does the URI identify the library uniquely?
-    # TODO: can we deduplicate shape graphs? use hash of graph?
     @classmethod
     def load(
         cls,
@@ -223,7 +222,7 @@ class Library:
         shape_col_id = lib.get_shape_collection().id
         assert shape_col_id is not None  # should always pass
         shape_col = ShapeCollection.load(shape_col_id)
-        shape_col.add_graph(ontology)
+        shape_col.replace_graph(ontology)
 
         if infer_templates:
             # infer shapes from any class/nodeshape candidates in the graph
@@ -250,18 +249,24 @@ class Library:
         shape_col_id = self.get_shape_collection().id
         assert shape_col_id is not None  # this should always pass
         shape_col = ShapeCollection.load(shape_col_id)
+        # parse into memory first so the shapes can be written to the database
+        # in one (bulk) insert
+        shape_graph = rdflib.Graph()
         for filename in get_ontology_files(directory):
             try:
-                shape_col.graph.parse(filename, format=guess_format(filename))
+                shape_graph.parse(filename, format=guess_format(filename))
             except (ParserError, BadSyntax) as e:
                 logging.getLogger(__name__).error(
                     f"Could not parse file {filename}: {e}"
                 )
                 raise e
+        for prefix, namespace in shape_graph.namespaces():
+            shape_col.graph.bind(prefix, namespace)
         if run_shacl_inference:
-            shape_col.graph = shacl_inference(
-                shape_col.graph, engine=get_building_motif().shacl_engine
+            shape_graph = shacl_inference(
+                shape_graph, engine=get_building_motif().shacl_engine
             )
+        shape_col.replace_graph(shape_graph)
         # infer shapes from any class/nodeshape candidates in the graph
         if infer_templates:
             shape_col.infer_templates(self)
@@ -449,9 +454,10 @@ class Library:
         :return: list of templates
         :rtype: List[Template]
         """
-        db_library = self._bm.table_connection.get_db_library(self._id)
-        templates: List[DBTemplate] = db_library.templates
-        return [Template.load(t.id) for t in templates]
+        db_templates = self._bm.table_connection.get_db_templates_by_library(
+            self._id
+        )
+        return Template.load_many(db_templates)
 
     def get_shape_collection(self) -> ShapeCollection:
         """Get ShapeCollection from library.
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from functools import cached_property
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, Iterable, List, Optional, Set
 
 import rdflib
 import rdflib.query
@@ -16,6 +16,56 @@ if TYPE_CHECKING:
     from buildingmotif.dataclasses.compiled_model import CompiledModel
 
 
+def _encode_triple(triple: Triple) -> List[List[Optional[str]]]:
+    """Encode a triple for the model changelog (see `DBModelChange.triple`)."""
+    encoded = []
+    for term in triple:
+        if isinstance(term, rdflib.Literal):
+            encoded.append(
+                [
+                    "L",
+                    str(term),
+                    str(term.datatype) if term.datatype else None,
+                    term.language,
+                ]
+            )
+        elif isinstance(term, rdflib.BNode):
+            encoded.append(["B", str(term), None, None])
+        else:
+            encoded.append(["U", str(term), None, None])
+    return encoded
+
+
+def _decode_triple(encoded: List[List[Optional[str]]]) -> Triple:
+    """Decode a triple encoded by `_encode_triple`."""
+    terms = []
+    for kind, value, datatype, language in encoded:
+        if kind == "L":
+            terms.append(
+                rdflib.Literal(
+                    value,
+                    lang=language,
+                    datatype=rdflib.URIRef(datatype) if datatype else None,
+                )
+            )
+        elif kind == "B":
+            terms.append(rdflib.BNode(value))
+        else:
+            terms.append(rdflib.URIRef(value))
+    return (terms[0], terms[1], terms[2])
+
+
+@dataclass
+class ModelChanges:
+    """The net change to the graph of a model since a given revision. See
+    :py:meth:`Model.changes_since`.
+    """
+
+    revision: int
+    added: rdflib.Graph
+    removed: rdflib.Graph
+
+
 def _validate_uri(uri: str):
     parsed = rfc3987.parse(uri)
     if not parsed["scheme"]:
@@ -168,14 +218,25 @@ class Model:
         self._bm.table_connection.update_db_model_description(self._id, new_description)
         self._description = new_description
 
+    @property
+    def revision(self) -> int:
+        """The revision of the model's changelog. Changes made through
+        :py:meth:`add_triples`, :py:meth:`add_graph` and
+        :py:meth:`remove_triples` each create a new revision; changes made
+        directly on :py:attr:`graph` are not recorded.
+        """
+        return self._bm.table_connection.get_db_model(self._id).revision
+
     def add_triples(self, *triples: Triple) -> None:
         """Add the given triples to the model.
 
         :param triples: a sequence of triples to add to the graph
         :type triples: Triple
         """
+        added = self._new_triples(triples)
         for triple in triples:
             self.graph.add(triple)
+        self._record_changes(added, [])
 
     def add_graph(self, graph: rdflib.Graph) -> None:
         """Add the given graph to the model.
@@ -183,7 +244,100 @@ class Model:
         :param graph: the graph to add to the model
         :type graph: rdflib.Graph
         """
-        self.graph += graph
+        added = self._new_triples(graph)
+        self._bm.graph_connection.add_graph(str(self.graph.identifier), graph)
+        self._record_changes(added, [])
+
+    def replace_graph(self, graph: rdflib.Graph) -> None:
+        """Replace the contents of the model with the given graph. Only the
+        triples which differ between the model and the graph are written, and
+        only they are recorded in the changelog. Blank nodes are compared by
+        label, so triples with blank nodes from a freshly parsed graph always
+        count as changed.
+
+        :param graph: the new contents of the model
+        :type graph: rdflib.Graph
+        """
+        existing = set(self.graph)
+        incoming = set(graph)
+        removed = existing - incoming
+        added = incoming - existing
+        for triple in removed:
+            self.graph.remove(triple)
+        if added:
+            added_graph = rdflib.Graph()
+            for triple in added:
+                added_graph.add(triple)
+            self._bm.graph_connection.add_graph(
+                str(self.graph.identifier), added_graph
+            )
+        self._record_changes(list(added), list(removed))
+
+    def _new_triples(self, triples: Iterable[Triple]) -> List[Triple]:
+        """Returns the given triples which are not in the model's graph yet.
+        Only the triples about their subjects are read, in one query per
+        batch of subjects.
+        """
+        candidates = list(dict.fromkeys(triples))
+        subjects = list({subject for subject, _, _ in candidates})
+        if not subjects:
+            return []
+        existing = set(self.graph.triples_choices((subjects, None, None)))
+        return [triple for triple in candidates if triple not in existing]
+
+    def remove_triples(self, *triples: Triple) -> None:
+        """Remove the triples matching the given patterns from the model.
+        Any term of a pattern may be None to match all terms.
+
+        :param triples: a sequence of triple patterns to remove from the graph
+        :type triples: Triple
+        """
+        removed = set()
+        for pattern in triples:
+            removed.update(self.graph.triples(pattern))
+            self.graph.remove(pattern)
+        self._record_changes([], list(removed))
+
+    def _record_changes(self, added: List[Triple], removed: List[Triple]) -> None:
+        self._bm.table_connection.add_db_model_changes(
+            self._id,
+            [_encode_triple(triple) for triple in added],
+            [_encode_triple(triple) for triple in removed],
+        )
+
+    def changes_since(self, revision: int = 0) -> ModelChanges:
+        """Get the net change to the model's graph since the given revision:
+        the triples which were added and are still present, and the triples
+        which were removed and have not been added back.
+
+        :param revision: revision to get the changes since; 0 is the model as
+            it was created, defaults to 0
+        :type revision: int, optional
+        :return: the current revision and the added and removed triples
+        :rtype: ModelChanges
+        """
+        added: Set[Triple] = set()
+        removed: Set[Triple] = set()
+        for change in self._bm.table_connection.get_db_model_changes(
+            self._id, revision
+        ):
+            triple = _decode_triple(change.triple)
+            if change.added:
+                if triple in removed:
+                    removed.discard(triple)
+                else:
+                    added.add(triple)
+            else:
+                if triple in added:
+                    added.discard(triple)
+                else:
+                    removed.add(triple)
+        added_graph, removed_graph = rdflib.Graph(), rdflib.Graph()
+        for triple in added:
+            added_graph.add(triple)
+        for triple in removed:
+            removed_graph.add(triple)
+        return ModelChanges(self.revision, added_graph, removed_graph)
 
     def validate(
         self,
@@ -238,7 +392,7 @@ class Model:
         if shape_collections is None:
             shape_collections = [self.get_manifest()]
         for shape_collection in shape_collections:
-            ontology_graph += shape_collection.graph
+            ontology_graph += shape_collection.cached_graph
 
         ontology_graph = skolemize_shapes(ontology_graph)
 
@@ -264,4 +418,4 @@ class Model:
         :param manifest: the ShapeCollection containing additional shapes against which to validate this model
         :type manifest: ShapeCollection
         """
-        self.get_manifest().graph += manifest.graph
+        self.get_manifest().add_graph(manifest.graph)
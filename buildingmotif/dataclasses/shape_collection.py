@@ -14,8 +14,14 @@ from rdflib.paths import ZeroOrMore, ZeroOrOne
 from rdflib.term import Node
 
 from buildingmotif import get_building_motif
+from buildingmotif.database.errors import ShapeCollectionNotFound
 from buildingmotif.namespaces import BMOTIF, OWL, SH
-from buildingmotif.utils import Triple, copy_graph, get_template_parts_from_shape
+from buildingmotif.utils import (
+    Triple,
+    copy_graph,
+    get_template_parts_from_shape,
+    graph_digest,
+)
 
 if TYPE_CHECKING:
     from buildingmotif import BuildingMOTIF
@@ -27,6 +33,37 @@ ONTOLOGY_FILE = (
 ontology = rdflib.Graph().parse(ONTOLOGY_FILE)
 
 
+class _ShapeCollectionGraph(rdflib.Graph):
+    """The database-backed graph of a ShapeCollection. Every write through it
+    (including `parse`, `+=` and `-=`, which are built on `addN` and `remove`)
+    drops the in-memory cached copy of the graph and clears the stored digest
+    of its contents, so neither can go stale.
+    """
+
+    def __init__(self, graph: rdflib.Graph, shape_collection_id: int):
+        super().__init__(store=graph.store, identifier=graph.identifier)
+        self._shape_collection_id = shape_collection_id
+
+    def _changed(self) -> None:
+        bm = get_building_motif()
+        bm.graph_connection.invalidate_cached_graph(str(self.identifier))
+        bm.table_connection.update_db_shape_collection_content_hash(
+            self._shape_collection_id, None
+        )
+
+    def add(self, triple):
+        self._changed()
+        return super().add(triple)
+
+    def addN(self, quads):
+        self._changed()
+        return super().addN(quads)
+
+    def remove(self, triple):
+        self._changed()
+        return super().remove(triple)
+
+
 @dataclass
 class ShapeCollection:
     """This class mirrors :py:class:`database.tables.DBShapeCollection`."""
@@ -48,7 +85,53 @@ class ShapeCollection:
             db_shape_collection.graph_id, rdflib.Graph()
         )
 
-        return cls(_id=db_shape_collection.id, graph=graph, _bm=bm)
+        return cls(
+            _id=db_shape_collection.id,
+            graph=_ShapeCollectionGraph(graph, db_shape_collection.id),
+            _bm=bm,
+        )
+
+    @classmethod
+    def from_graph(cls, graph: rdflib.Graph) -> "ShapeCollection":
+        """Get a ShapeCollection containing the given graph. Graphs are
+        content-addressed: if a ShapeCollection with identical contents was
+        already created by this method, it is returned instead of storing the
+        graph again. ShapeCollections owned by libraries and models are never
+        returned.
+
+        The returned ShapeCollection may be shared with other callers, so it
+        should be treated as read-only. Modifying it removes it from the
+        content-addressed lookup, but the change is still visible to everyone
+        who already holds it.
+
+        :param graph: the contents of the ShapeCollection
+        :type graph: rdflib.Graph
+        :return: ShapeCollection
+        :rtype: ShapeCollection
+        """
+        bm = get_building_motif()
+        content_hash = graph_digest(graph)
+        try:
+            db_shape_collection = (
+                bm.table_connection.get_db_shape_collection_by_content_hash(
+                    content_hash
+                )
+            )
+            return cls.load(db_shape_collection.id)
+        except ShapeCollectionNotFound:
+            pass
+        db_shape_collection = bm.table_connection.create_db_shape_collection(
+            content_addressed=True
+        )
+        stored_graph = bm.graph_connection.create_graph(
+            db_shape_collection.graph_id, graph
+        )
+        db_shape_collection.content_hash = content_hash
+        return cls(
+            _id=db_shape_collection.id,
+            graph=_ShapeCollectionGraph(stored_graph, db_shape_collection.id),
+            _bm=bm,
+        )
 
     @classmethod
     def load(cls, id: int) -> "ShapeCollection":
@@ -63,7 +146,11 @@ class ShapeCollection:
         db_shape_collection = bm.table_connection.get_db_shape_collection(id)
         graph = bm.graph_connection.get_graph(db_shape_collection.graph_id)
 
-        return cls(_id=db_shape_collection.id, graph=graph, _bm=bm)
+        return cls(
+            _id=db_shape_collection.id,
+            graph=_ShapeCollectionGraph(graph, db_shape_collection.id),
+            _bm=bm,
+        )
 
     @property
     def id(self) -> Optional[int]:
@@ -73,6 +160,17 @@ class ShapeCollection:
     def id(self, new_id):
         raise AttributeError("Cannot modify db id")
 
+    @property
+    def cached_graph(self) -> rdflib.Graph:
+        """An in-memory copy of the graph which is read from the database once
+        per transaction (see :py:meth:`GraphConnection.get_graph`). Use it for
+        read-heavy work such as compiling and validating models; modify the
+        ShapeCollection through :py:attr:`graph` or its methods instead.
+        """
+        return self._bm.graph_connection.get_graph(
+            str(self.graph.identifier), cached=True
+        )
+
     @property
     def graph_name(self) -> Optional[URIRef]:
         """
@@ -97,7 +195,31 @@ class ShapeCollection:
         :param graph: the graph to add to the ShapeCollection
         :type graph: rdflib.Graph
         """
-        self.graph += graph
+        self._bm.graph_connection.add_graph(str(self.graph.identifier), graph)
+        self._bm.table_connection.update_db_shape_collection_content_hash(
+            self._id, None
+        )
+
+    def replace_graph(self, graph: rdflib.Graph) -> None:
+        """Replace the contents of the ShapeCollection with the given graph.
+        Nothing is written if the ShapeCollection already has identical contents.
+
+        :param graph: the new contents of the ShapeCollection
+        :type graph: rdflib.Graph
+        """
+        content_hash = graph_digest(graph)
+        db_shape_collection = self._bm.table_connection.get_db_shape_collection(
+            self._id
+        )
+        if db_shape_collection.content_hash == content_hash:
+            logging.debug(
+                f"Shape collection {self._id} is unchanged; not rewriting its graph"
+            )
+            return
+        identifier = str(self.graph.identifier)
+        self._bm.graph_connection.delete_graph(identifier)
+        self._bm.graph_connection.add_graph(identifier, graph)
+        db_shape_collection.content_hash = content_hash
 
     def _cbd(self, shape_name, self_contained=True):
         """Retrieves the Concise Bounded Description (CBD) of the shape."""
@@ -130,19 +252,18 @@ class ShapeCollection:
             ontologies are missing (i.e. they need to be loaded into BuildingMOTIF), defaults
             to True
         :type error_on_missing_imports: bool, optional
-        :return: a new ShapeCollection with the types resolved
+        :return: a ShapeCollection with the types resolved; this is shared with
+            any other ShapeCollection which has identical contents
         :rtype: ShapeCollection
         """
         resolved_namespaces: Set[rdflib.URIRef] = set()
         resolved = _resolve_imports(
-            self.graph,
+            self.cached_graph,
             recursive_limit,
             resolved_namespaces,
             error_on_missing_imports=error_on_missing_imports,
         )
-        new_sc = ShapeCollection.create()
-        new_sc.add_graph(resolved)
-        return new_sc
+        return ShapeCollection.from_graph(resolved)
 
     @classmethod
     def _get_subclasses_of_definition_type(
@@ -575,7 +696,7 @@ def _resolve_imports(
             continue
 
         dependency = _resolve_imports(
-            sc_to_add.graph,
+            sc_to_add.cached_graph,
             recursive_limit - 1,
             seen,
             error_on_missing_imports=error_on_missing_imports,
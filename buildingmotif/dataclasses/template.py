@@ -3,7 +3,7 @@ import logging
 import warnings
 from collections import Counter
 from copy import copy
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from io import BytesIO, StringIO
 from itertools import chain
 from os import PathLike
@@ -25,6 +25,7 @@ from rdflib.term import Node
 
 from buildingmotif import get_building_motif
 from buildingmotif.database.errors import TemplateDependencyNotFound, TemplateNotFound
+from buildingmotif.database.tables import DBTemplate, DBTemplateDependency
 from buildingmotif.dataclasses.model import Model
 from buildingmotif.namespaces import bind_prefixes
 from buildingmotif.template_matcher import Mapping, TemplateMatcher
@@ -51,6 +52,14 @@ class Template:
     body: rdflib.Graph
     optional_args: List[str]
     _bm: "BuildingMOTIF"
+    # dependencies read together with the template by a batched load, and the
+    # TableConnection.template_dependency_revision they were read at. They are
+    # only used while that revision is current, so adding or removing a
+    # dependency through any Template instance makes them be read again.
+    _dependencies: Optional[Tuple["Dependency", ...]] = field(
+        default=None, repr=False, compare=False
+    )
+    _dependencies_revision: int = field(default=-1, repr=False, compare=False)
 
     @classmethod
     def load(cls, id: int) -> "Template":
@@ -73,6 +82,47 @@ class Template:
             _bm=bm,
         )
 
+    @classmethod
+    def load_many(cls, db_templates: List[DBTemplate]) -> List["Template"]:
+        """Build templates from database templates which have already been
+        read, e.g. by
+        :py:meth:`~buildingmotif.database.table_connection.TableConnection.get_db_templates_by_library`.
+        No further queries are made for the templates or their dependencies.
+
+        :param db_templates: database templates with their dependencies loaded
+        :type db_templates: List[DBTemplate]
+        :return: loaded templates, in the same order
+        :rtype: List[Template]
+        """
+        bm = get_building_motif()
+        revision = bm.table_connection.template_dependency_revision
+        templates = [
+            cls(
+                _id=db_template.id,
+                _name=db_template.name,
+                optional_args=db_template.optional_args,
+                body=bm.graph_connection.get_graph(db_template.body_id),
+                _bm=bm,
+                _dependencies=tuple(
+                    Dependency.from_db(dep) for dep in db_template.dependencies
+                ),
+                _dependencies_revision=revision,
+            )
+            for db_template in db_templates
+        ]
+        # dependencies on templates in the same batch resolve without a query
+        by_name = {
+            (db_template.library.name, db_template.name): template
+            for db_template, template in zip(db_templates, templates)
+        }
+        for template in templates:
+            for dep in template._dependencies or ():
+                key = (dep.dependency_library_name, dep.dependency_template_name)
+                if key in by_name:
+                    dep._template = by_name[key]
+                    dep._template_revision = revision
+        return templates
+
     def in_memory_copy(self) -> "Template":
         """Copy this template.
 
@@ -110,9 +160,15 @@ class Template:
         :return: a tuple of dependencies
         :rtype: Tuple
         """
+        if (
+            self._dependencies is not None
+            and self._dependencies_revision
+            == self._bm.table_connection.template_dependency_revision
+        ):
+            return self._dependencies
         return tuple(
             [
-                Dependency.load(dep.id)
+                Dependency.from_db(dep)
                 for dep in self._bm.table_connection.get_db_template_dependencies(
                     self._id
                 )
@@ -659,6 +715,11 @@ class Dependency:
     _dependency_library_name: str
     _dependency_template_name: str
     _args: Dict[str, str]
+    # the dependency template when it was loaded in the same batch as the
+    # dependant (see Template.load_many), valid while
+    # TableConnection.template_dependency_revision equals _template_revision
+    _template: Optional[Template] = field(default=None, repr=False, compare=False)
+    _template_revision: int = field(default=-1, repr=False, compare=False)
 
     @classmethod
     def load(cls, id: int) -> "Dependency":
@@ -667,9 +728,21 @@ class Dependency:
         if dep is None:
             raise TemplateDependencyNotFound(id)
 
+        return cls.from_db(dep)
+
+    @classmethod
+    def from_db(cls, dep: DBTemplateDependency) -> "Dependency":
+        """Build a dependency from a database dependency which has already
+        been read.
+
+        :param dep: database dependency
+        :type dep: DBTemplateDependency
+        :return: the dependency
+        :rtype: Dependency
+        """
         return cls(
-            _id=id,
-            _bm=bm,
+            _id=dep.id,
+            _bm=get_building_motif(),
             _dependency_library_name=dep.dependency_library_name,
             _dependency_template_name=dep.dependency_template_name,
             _args=dep.args,
@@ -689,6 +762,12 @@ class Dependency:
 
     @property
     def template(self) -> Optional[Template]:
+        if (
+            self._template is not None
+            and self._template_revision
+            == self._bm.table_connection.template_dependency_revision
+        ):
+            return self._template
         db_dependency = self._bm.table_connection.get_db_template_dependency(self._id)
         if db_dependency is None:
             return None
@@ -49,7 +49,12 @@ class TemplateBuilderContext(Graph):
 
         :param library: The library to add to the context
         """
-        for template in library.get_templates():
+        # the templates are read in one batch; dependencies between templates
+        # of the library resolve to the loaded templates without more queries
+        templates = Template.load_many(
+            library._bm.table_connection.get_db_templates_by_library(library.id)
+        )
+        for template in templates:
             self.add_template(template)
 
     def __getitem__(self, template_name):
@@ -1,3 +1,4 @@
+import hashlib
 import logging
 import secrets
 from collections import defaultdict
@@ -798,3 +799,75 @@ def graph_hash(graph: Graph) -> int:
     triple_canonicalizer = _TripleCanonicalizer(graph_prime)
 
     return triple_canonicalizer.to_hash()
+
+
+def graph_digest(graph: Graph) -> str:
+    """
+    Returns a hex digest of the graph contents which does not depend on the
+    labels of blank nodes. Graphs with equal digests are isomorphic, so the
+    digest can be used to find an existing copy of a graph.
+
+    Blank nodes are colored by iteratively refining a signature of the triples
+    they participate in (the "coloring" step used by rdflib's
+    canonicalization). Blank nodes which still share a color are then told
+    apart one at a time, refining again after each, until every blank node has
+    a color of its own; the digest covers the triples labeled with these
+    colors. Unlike :py:func:`graph_hash`, this does not try every way of
+    telling tied blank nodes apart, so it is fast enough for graphs the size of
+    Brick or QUDT. The price is that isomorphic graphs whose blank nodes tie
+    without being symmetric may get different digests, which only means a
+    copy is missed.
+
+    :param graph: graph to digest
+    :type graph: Graph
+    :return: hex digest of the graph contents
+    :rtype: str
+    """
+    triples = list(graph.triples((None, None, None)))
+    colors: Dict[Node, str] = {
+        node: "" for t in triples for node in t if isinstance(node, BNode)
+    }
+
+    def label(node: Node) -> str:
+        if isinstance(node, BNode):
+            return f"_:{colors[node]}"
+        return node.n3()
+
+    def refine() -> None:
+        nonlocal colors
+        num_colors = len(set(colors.values()))
+        while True:
+            signatures: Dict[Node, List[str]] = defaultdict(list)
+            for s, p, o in triples:
+                if isinstance(s, BNode):
+                    signatures[s].append(f"> {label(p)} {label(o)}")
+                if isinstance(o, BNode):
+                    signatures[o].append(f"< {label(s)} {label(p)}")
+            # a node's previous color is part of its signature, so colors
+            # only ever split and the loop ends once no class splits
+            colors = {
+                node: hashlib.sha256(
+                    "\n".join([color] + sorted(signatures[node])).encode()
+                ).hexdigest()
+                for node, color in colors.items()
+            }
+            new_num_colors = len(set(colors.values()))
+            if new_num_colors == num_colors:
+                return
+            num_colors = new_num_colors
+
+    refine()
+    while len(set(colors.values())) < len(colors):
+        classes: Dict[str, List[Node]] = defaultdict(list)
+        for node, color in colors.items():
+            classes[color].append(node)
+        color = min(color for color, nodes in classes.items() if len(nodes) > 1)
+        node = min(classes[color], key=str)
+        colors[node] = hashlib.sha256(f"{color}!".encode()).hexdigest()
+        refine()
+
+    digest = hashlib.sha256()
+    for line in sorted(f"{label(s)} {label(p)} {label(o)}" for s, p, o in triples):
+        digest.update(line.encode())
+        digest.update(b"\n")
+    return digest.hexdigest()
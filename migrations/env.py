@@ -32,6 +32,10 @@ sqlalchemy_rdflib_table_base_names = [
     "namespace_binds",
     "quoted_statements",
     "type_statements",
+    # tables of buildingmotif.database.term_store.TermDictionaryStore
+    "term_dictionary",
+    "term_quads",
+    "term_namespace_binds",
 ]
 
 
@@ -0,0 +1,31 @@
+"""shape collection content hash
+
+Revision ID: 3b2f6e0a9c14
+Revises: 6114d2b80bc6
+Create Date: 2026-10-17 10:02:11.418203
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3b2f6e0a9c14"
+down_revision = "6114d2b80bc6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("shape_collection", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("content_hash", sa.String(), nullable=True))
+        batch_op.create_index(
+            batch_op.f("ix_shape_collection_content_hash"),
+            ["content_hash"],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("shape_collection", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_shape_collection_content_hash"))
+        batch_op.drop_column("content_hash")
@@ -0,0 +1,70 @@
+"""term dictionary store
+
+Creates the tables of the optional integer-encoded graph store
+(`buildingmotif.database.term_store.TermDictionaryStore`). Existing graphs
+stay in the rdflib-sqlalchemy tables; to switch a database over, open both
+stores and call `buildingmotif.database.term_store.copy_store`.
+
+Revision ID: 8d41c7f2ab35
+Revises: 3b2f6e0a9c14
+Create Date: 2026-10-17 11:24:37.902114
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8d41c7f2ab35"
+down_revision = "3b2f6e0a9c14"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "term_dictionary",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("digest", sa.String(length=40), nullable=False),
+        sa.Column("kind", sa.String(length=1), nullable=False),
+        sa.Column("value", sa.Text(), nullable=False),
+        sa.Column("datatype", sa.Text(), nullable=True),
+        sa.Column("language", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("digest"),
+    )
+    op.create_table(
+        "term_quads",
+        sa.Column("context", sa.Integer(), nullable=False),
+        sa.Column("subject", sa.Integer(), nullable=False),
+        sa.Column("predicate", sa.Integer(), nullable=False),
+        sa.Column("object", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint(
+            "context", "subject", "predicate", "object", name="term_quads_spo"
+        ),
+    )
+    op.create_index(
+        "term_quads_pos",
+        "term_quads",
+        ["context", "predicate", "object", "subject"],
+        unique=False,
+    )
+    op.create_index(
+        "term_quads_osp",
+        "term_quads",
+        ["context", "object", "subject", "predicate"],
+        unique=False,
+    )
+    op.create_table(
+        "term_namespace_binds",
+        sa.Column("prefix", sa.String(), nullable=False),
+        sa.Column("uri", sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint("prefix"),
+    )
+
+
+def downgrade():
+    op.drop_table("term_namespace_binds")
+    op.drop_index("term_quads_osp", table_name="term_quads")
+    op.drop_index("term_quads_pos", table_name="term_quads")
+    op.drop_table("term_quads")
+    op.drop_table("term_dictionary")
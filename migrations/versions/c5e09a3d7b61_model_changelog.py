@@ -0,0 +1,48 @@
+"""model changelog
+
+Revision ID: c5e09a3d7b61
+Revises: 8d41c7f2ab35
+Create Date: 2026-10-17 12:08:51.227409
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+from buildingmotif.database.utils import JSONType
+
+# revision identifiers, used by Alembic.
+revision = "c5e09a3d7b61"
+down_revision = "8d41c7f2ab35"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("models", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("revision", sa.Integer(), nullable=False, server_default="0")
+        )
+
+    op.create_table(
+        "model_change",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("model_id", sa.Integer(), nullable=False),
+        sa.Column("revision", sa.Integer(), nullable=False),
+        sa.Column("added", sa.Boolean(), nullable=False),
+        sa.Column("triple", JSONType(), nullable=False),
+        sa.ForeignKeyConstraint(["model_id"], ["models.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_model_change_model_revision",
+        "model_change",
+        ["model_id", "revision"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_model_change_model_revision", table_name="model_change")
+    op.drop_table("model_change")
+    with op.batch_alter_table("models", schema=None) as batch_op:
+        batch_op.drop_column("revision")
@@ -0,0 +1,32 @@
+"""shape collection content addressed
+
+Revision ID: e4b81f3c92d0
+Revises: c5e09a3d7b61
+Create Date: 2026-10-17 16:41:27.503118
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e4b81f3c92d0"
+down_revision = "c5e09a3d7b61"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("shape_collection", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "content_addressed",
+                sa.Boolean(),
+                nullable=False,
+                server_default=sa.false(),
+            )
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("shape_collection", schema=None) as batch_op:
+        batch_op.drop_column("content_addressed")
@@ -126,6 +126,10 @@ def test_update_model_graph_overwrite(client, building_motif):
     expected_graph = Graph().parse(data=graph_data, format="ttl")
     assert isomorphic(results_graph, expected_graph)
     assert isomorphic(model.graph, expected_graph)
+    # the replacement is recorded in the model's changelog
+    changes = model.changes_since(0)
+    assert isomorphic(changes.added, expected_graph - default_graph)
+    assert isomorphic(changes.removed, default_graph - expected_graph)
 
 
 def test_update_model_graph_append(client, building_motif):
@@ -38,6 +38,20 @@ def test_get_all_templates(client, building_motif):
     ]
 
 
+def test_get_templates_of_library(client, building_motif):
+    # Setup
+    lib = Library.create("my_library")
+    template = lib.create_template("my_template")
+    Library.create("your_library").create_template("your_template")
+
+    # Act
+    results = client.get(f"/templates?library_id={lib.id}")
+
+    # Assert
+    assert results.status_code == 200
+    assert [t["id"] for t in results.json] == [template.id]
+
+
 def test_get_template(client, building_motif):
     # Setup
     lib = Library.create("my_library")
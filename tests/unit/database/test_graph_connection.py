@@ -1,12 +1,16 @@
+import os
 from pathlib import Path
 
 import pytest
-from rdflib import RDF, Graph, URIRef
+from rdflib import RDF, BNode, Graph, Literal, URIRef
 from rdflib.compare import isomorphic
 from rdflib.namespace import FOAF
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
 
 from buildingmotif.building_motif.building_motif import BuildingMotifEngine
 from buildingmotif.database.graph_connection import GraphConnection
+from buildingmotif.database.term_store import copy_store
 from tests.unit.conftest import MockBuildingMotif
 
 FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
@@ -14,11 +18,13 @@ SMALL_OFFICE_BRICK_TTL = FIXTURES_DIR / "smallOffice_brick.ttl"
 DB_FILE = FIXTURES_DIR / "smallOffice.db"
 
 
-@pytest.fixture
-def graph_connection():
+@pytest.fixture(params=["sqlalchemy", "term_dictionary"])
+def graph_connection(request):
     bm = MockBuildingMotif()
 
-    graph_connection = GraphConnection(BuildingMotifEngine(bm.engine, bm.Session))
+    graph_connection = GraphConnection(
+        BuildingMotifEngine(bm.engine, bm.Session), store_backend=request.param
+    )
     yield graph_connection
 
     bm.session.commit()
@@ -71,3 +77,191 @@ def test_delete_graph(graph_connection):
     assert graph_connection.get_all_graph_identifiers() == ["my_graph"]
     graph_connection.delete_graph("my_graph")
     assert graph_connection.get_all_graph_identifiers() == []
+
+
+def test_bulk_add_graph(graph_connection):
+    g = Graph()
+    g.parse(
+        data="""
+    @prefix ex: <http://example.org/> .
+    @prefix foaf: <http://xmlns.com/foaf/0.1/> .
+    @prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+    ex:hannah a foaf:Person ;
+        foaf:name "Hannah"@en ;
+        foaf:age "30"^^xsd:integer ;
+        foaf:knows ex:gabe, [ a foaf:Person ] .
+    """
+    )
+    graph_connection.bulk_add_graph("my_graph", g)
+
+    res = graph_connection.get_graph("my_graph")
+    assert isomorphic(res, g)
+
+    # adding the same triples again does not create duplicates
+    graph_connection.bulk_add_graph("my_graph", g)
+    assert len(graph_connection.get_graph("my_graph")) == len(g)
+
+
+@pytest.mark.postgres
+@pytest.mark.skipif(
+    "BUILDINGMOTIF_TEST_POSTGRES_URI" not in os.environ,
+    reason="needs a PostgreSQL database",
+)
+def test_bulk_add_graph_postgres_copy():
+    engine = create_engine(os.environ["BUILDINGMOTIF_TEST_POSTGRES_URI"])
+    Session = scoped_session(sessionmaker(bind=engine, autoflush=True))
+    graph_connection = GraphConnection(BuildingMotifEngine(engine, Session))
+    g = Graph()
+    g.parse(
+        data="""
+    @prefix ex: <http://example.org/> .
+    @prefix foaf: <http://xmlns.com/foaf/0.1/> .
+    ex:hannah a foaf:Person ;
+        foaf:name "Hannah\tthe\\first"@en ;
+        foaf:knows [ a foaf:Person ] .
+    """
+    )
+    try:
+        # the second load reuses the staging tables left on the connection
+        graph_connection.bulk_add_graph("pg_graph", g)
+        graph_connection.bulk_add_graph("pg_graph", g)
+        assert isomorphic(graph_connection.get_graph("pg_graph"), g)
+    finally:
+        Session().rollback()
+        Session.remove()
+        engine.dispose()
+
+
+def test_create_graph_uses_bulk_path_above_threshold(graph_connection):
+    graph_connection.bulk_load_threshold = 1
+    g = Graph()
+    hannahs_personhood = (URIRef("http://example.org/hannah"), RDF.type, FOAF.Person)
+    g.add(hannahs_personhood)
+
+    res = graph_connection.create_graph("my_graph", g)
+
+    assert isomorphic(res, g)
+    assert graph_connection.get_all_graph_identifiers() == ["my_graph"]
+
+
+def test_cached_graph_writes_back_on_commit():
+    bm = MockBuildingMotif()
+    graph_connection = GraphConnection(BuildingMotifEngine(bm.engine, bm.Session))
+    hannah = URIRef("http://example.org/hannah")
+    gabe = URIRef("http://example.org/gabe")
+    g = Graph()
+    g.add((hannah, RDF.type, FOAF.Person))
+    graph_connection.create_graph("my_graph", g)
+
+    cached = graph_connection.get_graph("my_graph", cached=True)
+    assert graph_connection.get_graph("my_graph", cached=True) is cached
+    cached.add((gabe, RDF.type, FOAF.Person))
+    cached.remove((hannah, None, None))
+
+    # changes are not visible in the database until the session is committed
+    stored = graph_connection.get_graph("my_graph")
+    assert (hannah, RDF.type, FOAF.Person) in stored
+    assert (gabe, RDF.type, FOAF.Person) not in stored
+
+    bm.session.commit()
+
+    assert set(graph_connection.get_graph("my_graph")) == {
+        (gabe, RDF.type, FOAF.Person)
+    }
+    assert not cached.dirty
+    bm.close()
+
+
+def test_term_dictionary_store_shares_terms():
+    bm = MockBuildingMotif()
+    graph_connection = GraphConnection(
+        BuildingMotifEngine(bm.engine, bm.Session), store_backend="term_dictionary"
+    )
+    hannah = URIRef("http://example.org/hannah")
+    g = Graph()
+    g.add((hannah, RDF.type, FOAF.Person))
+    g.add((hannah, FOAF.name, Literal("Hannah", lang="en")))
+    g.add((hannah, FOAF.nick, Literal("Hannah")))
+    graph_connection.create_graph("graph_1", g)
+    graph_connection.create_graph("graph_2", g)
+
+    # each distinct term is stored once: 2 graph identifiers, hannah,
+    # rdf:type, foaf:Person, foaf:name, foaf:nick and the two literals
+    terms = graph_connection.store.tables["terms"]
+    assert bm.session.query(terms).count() == 9
+    assert isomorphic(graph_connection.get_graph("graph_2"), g)
+    assert set(graph_connection.get_graph("graph_1").objects(hannah, None)) == {
+        FOAF.Person,
+        Literal("Hannah", lang="en"),
+        Literal("Hannah"),
+    }
+
+    graph_connection.get_graph("graph_1").bind("foaf", FOAF)
+    assert graph_connection.store.namespace("foaf") == URIRef(str(FOAF))
+    bm.close()
+
+
+def test_copy_store_to_term_dictionary(graph_connection):
+    if graph_connection.store_backend != "sqlalchemy":
+        pytest.skip("copies from the rdflib-sqlalchemy tables")
+    g = Graph()
+    g.add((URIRef("http://example.org/hannah"), RDF.type, FOAF.Person))
+    g.add((URIRef("http://example.org/hannah"), FOAF.knows, BNode()))
+    graph_connection.create_graph("my_graph", g)
+
+    target = GraphConnection(
+        graph_connection.store.engine, store_backend="term_dictionary"
+    )
+    copy_store(graph_connection.store, target.store)
+
+    assert target.get_all_graph_identifiers() == ["my_graph"]
+    assert isomorphic(target.get_graph("my_graph"), g)
+
+
+def test_cached_graph_keeps_writes_made_after_rollback():
+    bm = MockBuildingMotif()
+    graph_connection = GraphConnection(BuildingMotifEngine(bm.engine, bm.Session))
+    hannah = (URIRef("http://example.org/hannah"), RDF.type, FOAF.Person)
+    gabe = (URIRef("http://example.org/gabe"), RDF.type, FOAF.Person)
+    g = Graph()
+    g.add(hannah)
+    graph_connection.create_graph("my_graph", g)
+    bm.session.commit()
+
+    cached = graph_connection.get_graph("my_graph", cached=True)
+    cached.remove(hannah)
+    bm.session.rollback()
+    # the rolled back removal is discarded and the copy is reloaded
+    assert hannah in cached
+
+    cached.add(gabe)
+    bm.session.commit()
+    assert set(graph_connection.get_graph("my_graph")) == {hannah, gabe}
+    bm.close()
+
+
+def test_cached_graph_sees_writes_committed_elsewhere():
+    bm = MockBuildingMotif()
+    graph_connection = GraphConnection(BuildingMotifEngine(bm.engine, bm.Session))
+    hannah = (URIRef("http://example.org/hannah"), RDF.type, FOAF.Person)
+    gabe = (URIRef("http://example.org/gabe"), RDF.type, FOAF.Person)
+    g = Graph()
+    g.add(hannah)
+    graph_connection.create_graph("my_graph", g)
+    cached = graph_connection.get_graph("my_graph", cached=True)
+    assert len(cached) == 1
+    bm.session.commit()
+
+    graph_connection.get_graph("my_graph").add(gabe)
+    bm.session.commit()
+
+    assert gabe in graph_connection.get_graph("my_graph", cached=True)
+    assert gabe in cached
+
+    # writes through add_graph are visible within the same transaction too
+    bob = (URIRef("http://example.org/bob"), RDF.type, FOAF.Person)
+    g = Graph()
+    g.add(bob)
+    graph_connection.add_graph("my_graph", g)
+    assert bob in graph_connection.get_graph("my_graph", cached=True)
+    bm.close()
@@ -5,12 +5,20 @@ import pytest
 from rdflib import RDF, Graph, URIRef
 from rdflib.compare import isomorphic
 from rdflib.namespace import FOAF
+from sqlalchemy import event
 
 from buildingmotif import BuildingMOTIF
 from buildingmotif.dataclasses import Library
 from tests.unit.conftest import MockLibrary
 
 
+PARAM_BODY = """
+@prefix P: <urn:___param___#> .
+@prefix brick: <https://brickschema.org/schema/Brick#> .
+P:name a brick:Equipment .
+"""
+
+
 def test_create(clean_building_motif):
     lib = Library.create("my_library")
 
@@ -49,6 +57,44 @@ def test_get_templates(clean_building_motif):
     assert [r.id for r in results] == [t1.id, t2.id]
 
 
+def test_get_templates_uses_constant_number_of_queries(bm: BuildingMOTIF):
+    lib = Library.load(directory="tests/unit/fixtures/templates")
+    bm.session.commit()
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(bm.engine, "before_cursor_execute", count)
+    try:
+        templates = lib.get_templates()
+        dependencies = {t.name: t.get_dependencies() for t in templates}
+    finally:
+        event.remove(bm.engine, "before_cursor_execute", count)
+
+    # one query for the templates and one for all of their dependencies
+    assert len(statements) == 2
+    assert len(templates) == 7
+    assert {d.dependency_template_name for d in dependencies["vav"]} == {
+        "temp-sensor"
+    }
+
+
+def test_get_templates_sees_dependencies_added_elsewhere(clean_building_motif):
+    lib = Library.create("my_library")
+    lib.create_template("dep", Graph().parse(data=PARAM_BODY, format="ttl"))
+    lib.create_template("parent", Graph().parse(data=PARAM_BODY, format="ttl"))
+    parent = next(t for t in lib.get_templates() if t.name == "parent")
+    assert parent.get_dependencies() == ()
+
+    # add the dependency through a different instance of the same template
+    other = lib.get_template_by_name("parent")
+    other.add_dependency(lib.get_template_by_name("dep"), {"name": "name"})
+
+    assert [d.dependency_template_name for d in parent.get_dependencies()] == ["dep"]
+
+
 def test_get_shape_collection(clean_building_motif):
     lib = Library.create("my_library")
     shape_collection = lib.get_shape_collection()
@@ -138,6 +184,31 @@ def test_load_library_overwrite_graph(bm: BuildingMOTIF):
     assert len(lib.get_templates()) == 2, "Library is overwritten improperly"
 
 
+def test_reload_unchanged_library_adds_no_graph_rows(bm: BuildingMOTIF, monkeypatch):
+    lib = Library.load(ontology_graph="tests/unit/fixtures/Brick.ttl")
+    bm.session.commit()
+    shape_collection_id = lib.get_shape_collection().id
+    identifier = str(lib.get_shape_collection().graph.identifier)
+    num_triples = len(lib.get_shape_collection().graph)
+
+    # record every graph written to or deleted during the reload
+    written = []
+    for name in ["add_graph", "bulk_add_graph", "delete_graph"]:
+        original = getattr(bm.graph_connection, name)
+
+        def record(graph_identifier, *args, original=original):
+            written.append(graph_identifier)
+            return original(graph_identifier, *args)
+
+        monkeypatch.setattr(bm.graph_connection, name, record)
+
+    lib = Library.load(ontology_graph="tests/unit/fixtures/Brick.ttl")
+    bm.session.commit()
+    assert lib.get_shape_collection().id == shape_collection_id
+    assert len(lib.get_shape_collection().graph) == num_triples
+    assert identifier not in written, "unchanged graph was rewritten"
+
+
 def test_load_library_overwrite_directory(bm: BuildingMOTIF):
     first = "tests/unit/fixtures/overwrite-test/1/A"
     second = "tests/unit/fixtures/overwrite-test/2/A"
@@ -92,6 +92,62 @@ def test_from_graph(clean_building_motif):
     assert len(model.graph) == 2
 
 
+def test_model_changes_since(clean_building_motif):
+    BLDG = Namespace("urn:building/")
+    m = Model.create(name="urn:building")
+    assert m.revision == 0
+
+    m.add_triples(
+        (BLDG["vav1"], A, BRICK.VAV), (BLDG["vav1"], RDFS.label, Literal("1"))
+    )
+    g = Graph()
+    g.add((BLDG["vav1"], A, BRICK.VAV))
+    g.add((BLDG["ahu1"], A, BRICK.AHU))
+    m.add_graph(g)
+    assert m.revision == 2
+
+    changes = m.changes_since(0)
+    assert changes.revision == 2
+    assert set(changes.added) == {
+        (BLDG["vav1"], A, BRICK.VAV),
+        (BLDG["vav1"], RDFS.label, Literal("1")),
+        (BLDG["ahu1"], A, BRICK.AHU),
+    }
+    assert len(changes.removed) == 0
+
+    # removing a triple that was added after the revision cancels it out;
+    # removing one that existed before shows up as removed
+    m.remove_triples((BLDG["vav1"], RDFS.label, None))
+    changes = m.changes_since(1)
+    assert set(changes.added) == {(BLDG["ahu1"], A, BRICK.AHU)}
+    assert set(changes.removed) == {(BLDG["vav1"], RDFS.label, Literal("1"))}
+
+    # nothing changed since the current revision
+    changes = m.changes_since(m.revision)
+    assert len(changes.added) == 0 and len(changes.removed) == 0
+
+
+def test_model_replace_graph_records_difference(clean_building_motif):
+    m = Model.create(name="urn:building")
+    m.add_triples((BLDG["vav1"], A, BRICK.VAV), (BLDG["ahu1"], A, BRICK.AHU))
+    revision = m.revision
+    g = Graph()
+    for triple in m.graph:
+        g.add(triple)
+
+    # replacing the graph with identical contents records nothing
+    m.replace_graph(g)
+    assert m.revision == revision
+
+    g.remove((BLDG["ahu1"], A, BRICK.AHU))
+    g.add((BLDG["vav2"], A, BRICK.VAV))
+    m.replace_graph(g)
+    assert isomorphic(m.graph, g)
+    changes = m.changes_since(revision)
+    assert set(changes.added) == {(BLDG["vav2"], A, BRICK.VAV)}
+    assert set(changes.removed) == {(BLDG["ahu1"], A, BRICK.AHU)}
+
+
 def test_update_model_manifest(clean_building_motif):
     m = Model.create(name="https://example.com", description="a very good model")
     lib = Library.load(ontology_graph="tests/unit/fixtures/shapes/shape1.ttl")
@@ -110,6 +110,67 @@ def test_shape_collection_resolve_imports(clean_building_motif):
     assert len(new_sc.graph) > len(sc.graph)
 
 
+def test_shape_collection_resolve_imports_is_deduplicated(clean_building_motif):
+    Library.load(ontology_graph="tests/unit/fixtures/Brick.ttl")
+    Library.load(ontology_graph="constraints/constraints.ttl")
+    lib = Library.load(ontology_graph="tests/unit/fixtures/shapes/import_test.ttl")
+    sc = lib.get_shape_collection()
+    first = sc.resolve_imports()
+    num_graphs = len(clean_building_motif.graph_connection.get_all_graph_identifiers())
+    num_triples = len(clean_building_motif.graph_connection.store)
+
+    second = sc.resolve_imports()
+    assert second.id == first.id
+    assert (
+        len(clean_building_motif.graph_connection.get_all_graph_identifiers())
+        == num_graphs
+    )
+    assert len(clean_building_motif.graph_connection.store) == num_triples
+
+
+def test_shape_collection_from_graph(clean_building_motif):
+    g = Graph()
+    g.add((URIRef("http://example.org/alex"), RDF.type, FOAF.Person))
+    g.add((URIRef("http://example.org/alex"), FOAF.knows, rdflib.BNode()))
+
+    sc = ShapeCollection.from_graph(g)
+    assert isomorphic(sc.graph, g)
+
+    # an isomorphic graph with different blank node labels is shared
+    g2 = Graph()
+    g2.add((URIRef("http://example.org/alex"), RDF.type, FOAF.Person))
+    g2.add((URIRef("http://example.org/alex"), FOAF.knows, rdflib.BNode()))
+    assert ShapeCollection.from_graph(g2).id == sc.id
+
+    # modifying the shape collection stops it from being shared
+    sc.add_triples((URIRef("http://example.org/bob"), RDF.type, FOAF.Person))
+    assert ShapeCollection.from_graph(g2).id != sc.id
+
+
+def test_shape_collection_from_graph_ignores_library_collections(
+    clean_building_motif,
+):
+    lib = Library.load(ontology_graph="tests/unit/fixtures/shapes/shape1.ttl")
+    sc = lib.get_shape_collection()
+    # a graph with no imports resolves to its own contents, but the library's
+    # shape collection must not be handed out as a shared one
+    resolved = sc.resolve_imports(error_on_missing_imports=False)
+    assert resolved.id != sc.id
+    assert isomorphic(resolved.graph, sc.graph)
+
+
+def test_shape_collection_direct_write_clears_digest(clean_building_motif):
+    g = Graph()
+    g.add((URIRef("http://example.org/alex"), RDF.type, FOAF.Person))
+    sc = ShapeCollection.from_graph(g)
+
+    sc.graph.parse(
+        data="<http://example.org/bob> a <http://xmlns.com/foaf/0.1/Person> .",
+        format="turtle",
+    )
+    assert ShapeCollection.from_graph(g).id != sc.id
+
+
 def test_get_shapes_for_class(clean_building_motif):
     brick = Library.load(
         ontology_graph="tests/unit/fixtures/Brick1.3rc1-equip-only.ttl"
@@ -11,6 +11,7 @@ from buildingmotif.utils import (
     _strip_param,
     get_parameters,
     get_template_parts_from_shape,
+    graph_digest,
     graph_hash,
     replace_nodes,
     rewrite_shape_graph,
@@ -361,6 +362,22 @@ def test_hash(bm: BuildingMOTIF):
     assert before_hash == after_hash, "Graph with same state resulted in different hash"
 
 
+def test_graph_digest():
+    two_cycles = Graph().parse(
+        data=PREAMBLE + "_:a :p _:b . _:b :p _:a . _:c :p _:d . _:d :p _:c ."
+    )
+    four_cycle = Graph().parse(
+        data=PREAMBLE + "_:a :p _:b . _:b :p _:c . _:c :p _:d . _:d :p _:a ."
+    )
+    # every blank node looks the same locally, but the graphs differ
+    assert graph_digest(two_cycles) != graph_digest(four_cycle)
+
+    relabeled = Graph().parse(
+        data=PREAMBLE + "_:w :p _:x . _:x :p _:w . _:y :p _:z . _:z :p _:y ."
+    )
+    assert graph_digest(two_cycles) == graph_digest(relabeled)
+
+
 def test_strip_param():
     # if value is 'None', key should remain unchanged
     inputs = {